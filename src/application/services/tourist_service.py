@@ -1,25 +1,139 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Optional
 from domain.models.tourist import Tourist
 from domain.models.preference import Preference
+from domain.models.idempotency_record import IdempotencyRecord
 from domain.repositories.tourist_repository import TouristRepositoryInterface
+from domain.repositories.idempotency_repository import IdempotencyRepositoryInterface
+
+logger = logging.getLogger("tourist-service")
+
+IDEMPOTENCY_POLL_INITIAL_SECONDS = 0.05  # First re-check of a key claimed by another instance
+IDEMPOTENCY_POLL_MAX_SECONDS = 1.0  # Re-checks back off exponentially up to this interval
+
+
+class IdempotencyKeyInProgressError(RuntimeError):
+    """Raised when a request with the same idempotency key is still running elsewhere."""
+
 
 class TouristService:
-    def __init__(self, repository: TouristRepositoryInterface):
+    def __init__(
+        self,
+        repository: TouristRepositoryInterface,
+        idempotency_repository: Optional[IdempotencyRepositoryInterface] = None,
+        idempotency_wait_seconds: float = 10.0,
+        idempotency_lease_seconds: float = 30.0,
+    ):
         """
         Initialize the TouristService with a repository instance.
         :param repository: An implementation of TouristRepositoryInterface.
+        :param idempotency_repository: An optional store for replaying creates sent with an idempotency key.
+        :param idempotency_wait_seconds: How long to wait for a create claimed by another instance.
+        :param idempotency_lease_seconds: How long a claim blocks retries before it can be taken over.
         """
         self.repository = repository
+        self.idempotency_repository = idempotency_repository
+        self.idempotency_wait_seconds = idempotency_wait_seconds
+        self.idempotency_lease_seconds = idempotency_lease_seconds
+        self._in_flight: dict[str, asyncio.Task] = {}  # Idempotency key -> pending create in this process
 
-    def create_tourist(self, name: str, email: str) -> Tourist:
+    async def create_tourist(self, name: str, email: str, idempotency_key: Optional[str] = None) -> Tourist:
         """
         Create a new tourist and save them to the repository.
+        Retries sent with the same idempotency key return the original tourist. Concurrent
+        duplicates in this process await a single create; across instances the key is
+        claimed in the idempotency store first, so a shared (Mongo) store dedupes there too.
+        Waiting happens on the event loop; only blocking repository calls run in worker threads.
         :param name: The name of the tourist.
         :param email: The email of the tourist.
+        :param idempotency_key: An optional client-supplied key identifying this create.
         :return: The created Tourist object.
+        :raises ValueError: If the idempotency key was already used for a different request.
+        :raises IdempotencyKeyInProgressError: If the create is still running elsewhere after the wait.
         """
-        tourist = Tourist(name=name, email=email)
-        self.repository.save(tourist)
-        return tourist
+        if idempotency_key is None or self.idempotency_repository is None:
+            tourist = Tourist(name=name, email=email)
+            await asyncio.to_thread(self.repository.save, tourist)
+            return tourist
+
+        fingerprint = self._fingerprint(name, email)
+        task = self._in_flight.get(idempotency_key)
+        if task is None:
+            task = asyncio.ensure_future(self._create_once(idempotency_key, fingerprint, name, email))
+            self._in_flight[idempotency_key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(idempotency_key, None))
+        # Shield the shared create so one caller disconnecting does not cancel it for the others
+        record = await asyncio.shield(task)
+
+        if record.fingerprint != fingerprint:
+            raise ValueError("Idempotency-Key was already used for a different request")
+        return record.tourist
+
+    async def _create_once(self, key: str, fingerprint: str, name: str, email: str) -> IdempotencyRecord:
+        """
+        Claim the key in the idempotency store, then either create the tourist or wait for the claim's owner.
+        :param key: The idempotency key.
+        :param fingerprint: The fingerprint of this request.
+        :param name: The name of the tourist.
+        :param email: The email of the tourist.
+        :return: The completed record, or the existing record if the fingerprint differs.
+        :raises IdempotencyKeyInProgressError: If the owner does not finish within the wait.
+        """
+        deadline = time.monotonic() + self.idempotency_wait_seconds
+        delay = IDEMPOTENCY_POLL_INITIAL_SECONDS
+        claim = self.idempotency_repository.claim
+        record = await asyncio.to_thread(claim, key, fingerprint, self.idempotency_lease_seconds)
+        while record is not None and record.tourist is None and record.fingerprint == fingerprint:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyKeyInProgressError("A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, IDEMPOTENCY_POLL_MAX_SECONDS)
+            # Re-claiming takes over the create if the owner released its claim or its lease ran out
+            record = await asyncio.to_thread(claim, key, fingerprint, self.idempotency_lease_seconds)
+        if record is not None:
+            return record
+        return await asyncio.to_thread(self._create_claimed, key, fingerprint, name, email)
+
+    def _create_claimed(self, key: str, fingerprint: str, name: str, email: str) -> IdempotencyRecord:
+        """
+        Create the tourist for a claimed idempotency key and record the outcome.
+        :param key: The claimed idempotency key.
+        :param fingerprint: The fingerprint of this request.
+        :param name: The name of the tourist.
+        :param email: The email of the tourist.
+        :return: The completed record.
+        """
+        try:
+            tourist = Tourist(name=name, email=email)
+            self.repository.save(tourist)
+        except Exception:
+            try:
+                self.idempotency_repository.release(key)
+            except Exception as e:
+                logger.error(f"Failed to release idempotency key {key}; retries will wait until its lease expires: {e}")
+            raise
+
+        try:
+            self.idempotency_repository.complete(key, tourist)
+        except Exception as e:
+            # The tourist exists, so report success rather than prompt a retry; the key stays
+            # pending, so retries get a conflict until the lease runs out and they take it over
+            logger.error(f"Created tourist {tourist.id} but failed to record idempotency key {key}: {e}")
+        return IdempotencyRecord(key=key, fingerprint=fingerprint, tourist=tourist)
+
+    @staticmethod
+    def _fingerprint(name: str, email: str) -> str:
+        """
+        Hash the fields of a create request so reused idempotency keys can be detected.
+        :param name: The name of the tourist.
+        :param email: The email of the tourist.
+        :return: A hex digest identifying the request.
+        """
+        return hashlib.sha256(f"{name}\n{email.lower()}".encode()).hexdigest()
 
     def update_preferences(self, tourist_id: str, travel_type: str, nights: int, group_size: int) -> Tourist:
         """
@@ -66,3 +180,15 @@ class TouristService:
         if not tourist:
             raise ValueError("Tourist not found")
         return tourist
+
+    def search_tourists(self, prefix: str, limit: int = 10) -> list[Tourist]:
+        """
+        Look up tourists by the start of their name or email.
+        :param prefix: The prefix to match (case-insensitive).
+        :param limit: The maximum number of tourists to return.
+        :return: A list of matching Tourist objects.
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        return self.repository.search_by_prefix(prefix, limit)
@@ -0,0 +1,10 @@
+# Idempotency record model with Pydantic (simple and domain-focused)
+from typing import Optional
+from pydantic import BaseModel
+from domain.models.tourist import Tourist
+
+
+class IdempotencyRecord(BaseModel):
+    key: str
+    fingerprint: str
+    tourist: Optional[Tourist] = None  # None while the claiming request is still in progress
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from domain.models.idempotency_record import IdempotencyRecord
+from domain.models.tourist import Tourist
+
+class IdempotencyRepositoryInterface(ABC):
+    @abstractmethod
+    def claim(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        """
+        Atomically claim an idempotency key by storing a pending record for it.
+        A pending record whose lease has expired is taken over, so a crashed owner
+        only blocks its key for the length of the lease.
+        :param key: The idempotency key sent by the client.
+        :param fingerprint: A hash identifying the request that uses the key.
+        :param lease_seconds: How long the claim blocks other callers before it can be taken over.
+        :return: None if the key was claimed, otherwise the existing record for the key.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, key: str, tourist: Tourist) -> None:
+        """
+        Store the outcome of a claimed request; completed records are kept for the full TTL.
+        :param key: The claimed idempotency key.
+        :param tourist: The tourist created by the request.
+        """
+        pass
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """
+        Drop a pending claim so a retry can run the request again.
+        :param key: The claimed idempotency key.
+        """
+        pass
+
+    @abstractmethod
+    def find(self, key: str) -> Optional[IdempotencyRecord]:
+        """
+        Find an unexpired record, pending or complete, by its idempotency key.
+        :param key: The idempotency key sent by the client.
+        :return: The idempotency record, or None if not found or expired.
+        """
+        pass
@@ -36,3 +36,13 @@ class TouristRepositoryInterface(ABC):
         :return: A list of all tourists.
         """
         pass
+
+    @abstractmethod
+    def search_by_prefix(self, prefix: str, limit: int) -> List[Tourist]:
+        """
+        Find tourists whose name or email starts with the given prefix (case-insensitive).
+        :param prefix: The prefix to match against name and email.
+        :param limit: The maximum number of tourists to return.
+        :return: A list of matching tourists, name matches first.
+        """
+        pass
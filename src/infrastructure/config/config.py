@@ -13,6 +13,11 @@ class AppConfig(BaseSettings):
     mongo_host: str = "localhost"
     mongo_port: int = 27017
     mongo_database: str 
+    idempotency_store: str = "memory"  # "memory" or "mongo"
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 100000
+    idempotency_wait_seconds: float = 10.0
+    idempotency_lease_seconds: float = 30.0  # How long a pending claim blocks retries if its owner dies
 
     @property
     def mongo_uri(self) -> str:
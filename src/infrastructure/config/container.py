@@ -1,12 +1,16 @@
 from fastapi import Depends
 from domain.repositories.tourist_repository import TouristRepositoryInterface
+from domain.repositories.idempotency_repository import IdempotencyRepositoryInterface
 from infrastructure.repositories.in_memory_tourist_repository import MemoryTouristRepository
 from infrastructure.repositories.mongodb_tourist_repository import MongoDBTouristRepository
+from infrastructure.repositories.in_memory_idempotency_repository import MemoryIdempotencyRepository
+from infrastructure.repositories.mongodb_idempotency_repository import MongoDBIdempotencyRepository
 from application.services.tourist_service import TouristService
 from .config import AppConfig
 
 # Cache to store singleton instances
 repository_cache = None
+idempotency_repository_cache = None
 tourist_service_cache = None
 
 # Initialize the configuration globally
@@ -22,24 +26,62 @@ class RepositoryFactory:
             return MongoDBTouristRepository(config)
         return MemoryTouristRepository()
 
+    @staticmethod
+    def create_idempotency_repository() -> IdempotencyRepositoryInterface:
+        """
+        Factory method to create the appropriate idempotency store implementation.
+        """
+        if config.idempotency_store == "mongo":
+            # Share the tourist repository's client and database when it is on Mongo too
+            repository = get_repository()
+            if isinstance(repository, MongoDBTouristRepository):
+                return MongoDBIdempotencyRepository(config, database=repository.db)
+            return MongoDBIdempotencyRepository(config)
+        return MemoryIdempotencyRepository(
+            ttl_seconds=config.idempotency_ttl_seconds,
+            max_entries=config.idempotency_max_entries,
+        )
+
 def get_repository() -> TouristRepositoryInterface:
     global repository_cache
     if repository_cache is None:
         repository_cache = RepositoryFactory.create_repository()
     return repository_cache
 
+def get_idempotency_repository() -> IdempotencyRepositoryInterface:
+    global idempotency_repository_cache
+    if idempotency_repository_cache is None:
+        idempotency_repository_cache = RepositoryFactory.create_idempotency_repository()
+    return idempotency_repository_cache
+
 def get_tourist_service(
-    repository: TouristRepositoryInterface = Depends(get_repository)
+    repository: TouristRepositoryInterface = Depends(get_repository),
+    idempotency_repository: IdempotencyRepositoryInterface = Depends(get_idempotency_repository),
 ) -> TouristService:
     global tourist_service_cache
     if tourist_service_cache is None:
-        tourist_service_cache = TouristService(repository=repository)
+        tourist_service_cache = TouristService(
+            repository=repository,
+            idempotency_repository=idempotency_repository,
+            idempotency_wait_seconds=config.idempotency_wait_seconds,
+            idempotency_lease_seconds=config.idempotency_lease_seconds,
+        )
     return tourist_service_cache
 
+def migrate_repository():
+    """
+    Run one-off data migrations before the application serves traffic.
+    """
+    repository = get_repository()
+    if isinstance(repository, MongoDBTouristRepository):
+        repository.backfill_prefix_fields()
+
 def shutdown_repository():
     """
     Clean up resources used by repositories.
     """
-    global repository_cache
+    global repository_cache, idempotency_repository_cache
     if repository_cache and isinstance(repository_cache, MongoDBTouristRepository):
         repository_cache.close_connection()
+    if idempotency_repository_cache and isinstance(idempotency_repository_cache, MongoDBIdempotencyRepository):
+        idempotency_repository_cache.close_connection()
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends
-from application.services.tourist_service import TouristService
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from application.services.tourist_service import TouristService, IdempotencyKeyInProgressError
 from application.schemas.tourist import CreateTouristRequest, UpdatePreferencesRequest
 from infrastructure.config.container import get_tourist_service
 
@@ -8,9 +9,15 @@ router = APIRouter()
 @router.post("/")
 async def create_tourist(
     request: CreateTouristRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     service: TouristService = Depends(get_tourist_service)
 ):
-    tourist = service.create_tourist(request.name, request.email)
+    try:
+        tourist = await service.create_tourist(request.name, request.email, idempotency_key)
+    except IdempotencyKeyInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     return {"id": tourist.id, "name": tourist.name, "email": tourist.email}
 
 
@@ -36,6 +43,15 @@ def list_tourists(service: TouristService = Depends(get_tourist_service)):
         for tourist in tourists
     ]
 
+@router.get("/lookup")
+def lookup_tourists(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    service: TouristService = Depends(get_tourist_service),
+):
+    tourists = service.search_tourists(prefix, limit)
+    return [{"id": tourist.id, "name": tourist.name, "email": tourist.email} for tourist in tourists]
+
 @router.get("/{tourist_id}")
 def get_tourist(tourist_id: str, service: TouristService = Depends(get_tourist_service)):
     try:
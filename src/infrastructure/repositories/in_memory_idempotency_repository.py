@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from domain.repositories.idempotency_repository import IdempotencyRepositoryInterface
+from domain.models.idempotency_record import IdempotencyRecord
+from domain.models.tourist import Tourist
+
+# Configure logger for this module
+logger = logging.getLogger("tourist-service")
+
+class MemoryIdempotencyRepository(IdempotencyRepositoryInterface):
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        """
+        Initialize a bounded, TTL-evicted in-memory store.
+        Claims are only visible to this process; use the Mongo store to dedupe across instances.
+        :param ttl_seconds: How long a record is kept after it is claimed or completed.
+        :param max_entries: The maximum number of records kept; the oldest completed records are evicted first.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.storage = OrderedDict()  # key -> (expires_at, lease_expires_at, record), oldest first
+        self.lock = threading.Lock()
+        logger.info(f"Initialized MemoryIdempotencyRepository (ttl={ttl_seconds}s, max_entries={max_entries}).")
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop expired records.
+        Records are (re)inserted at the end with a fresh TTL, so insertion order is also expiry order.
+        Callers must hold self.lock.
+        :param now: The current monotonic time.
+        """
+        while self.storage:
+            key, (expires_at, _, _) = next(iter(self.storage.items()))
+            if expires_at > now:
+                break
+            del self.storage[key]
+            logger.debug(f"Evicted expired idempotency key: {key}")
+
+    def _get(self, key: str, now: float) -> Optional[tuple]:
+        """
+        Return the unexpired entry for a key, dropping it if it has expired.
+        Callers must hold self.lock.
+        :param key: The idempotency key.
+        :param now: The current monotonic time.
+        """
+        entry = self.storage.get(key)
+        if entry and entry[0] <= now:
+            del self.storage[key]
+            return None
+        return entry
+
+    def claim(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        """
+        Atomically claim an idempotency key by storing a pending record for it.
+        :param key: The idempotency key sent by the client.
+        :param fingerprint: A hash identifying the request that uses the key.
+        :param lease_seconds: How long the claim blocks other callers before it can be taken over.
+        :return: None if the key was claimed, otherwise the existing record for the key.
+        :raises RuntimeError: If the store is full of pending claims.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self._evict(now)
+            entry = self._get(key, now)
+            if entry:
+                _, lease_expires_at, record = entry
+                if record.tourist is not None or lease_expires_at > now:
+                    return record
+                del self.storage[key]  # The owner's lease has expired; take the claim over
+                logger.warning(f"Taking over expired claim on idempotency key: {key}")
+            elif len(self.storage) >= self.max_entries:
+                self._evict_one_completed()
+            self.storage[key] = (
+                now + self.ttl_seconds,
+                now + lease_seconds,
+                IdempotencyRecord(key=key, fingerprint=fingerprint),
+            )
+        logger.info(f"Claimed idempotency key: {key}")
+        return None
+
+    def _evict_one_completed(self) -> None:
+        """
+        Make room for a new claim by evicting the oldest completed record.
+        Pending claims are never evicted, since their owner is still running.
+        Callers must hold self.lock.
+        :raises RuntimeError: If every record is a pending claim.
+        """
+        for key, (_, _, record) in self.storage.items():
+            if record.tourist is not None:
+                del self.storage[key]
+                logger.debug(f"Evicted idempotency key: {key}")
+                return
+        raise RuntimeError("Idempotency store is full of in-progress requests")
+
+    def complete(self, key: str, tourist: Tourist) -> None:
+        """
+        Store the outcome of a claimed request; completed records are kept for the full TTL.
+        :param key: The claimed idempotency key.
+        :param tourist: The tourist created by the request.
+        """
+        with self.lock:
+            entry = self.storage.pop(key, None)
+            if entry:
+                record = entry[2].model_copy(update={"tourist": tourist})
+                self.storage[key] = (time.monotonic() + self.ttl_seconds, None, record)
+        logger.info(f"Completed idempotency key: {key}")
+
+    def release(self, key: str) -> None:
+        """
+        Drop a pending claim so a retry can run the request again.
+        :param key: The claimed idempotency key.
+        """
+        with self.lock:
+            entry = self.storage.get(key)
+            if entry and entry[2].tourist is None:
+                del self.storage[key]
+        logger.info(f"Released idempotency key: {key}")
+
+    def find(self, key: str) -> Optional[IdempotencyRecord]:
+        """
+        Find an unexpired record, pending or complete, by its idempotency key.
+        :param key: The idempotency key sent by the client.
+        :return: The idempotency record, or None if not found or expired.
+        """
+        with self.lock:
+            entry = self._get(key, time.monotonic())
+        return entry[2] if entry else None
@@ -1,4 +1,6 @@
 import logging
+import threading
+from bisect import bisect_left, insort
 from typing import Optional, List
 from domain.repositories.tourist_repository import TouristRepositoryInterface
 from domain.models.tourist import Tourist
@@ -16,22 +18,66 @@ class MemoryTouristRepository(TouristRepositoryInterface):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.storage = {}  # Initialize storage on the first instance
+            cls._instance.name_index = []  # Sorted (lowercase name, id) pairs for prefix lookups
+            cls._instance.email_index = []  # Sorted (lowercase email, id) pairs for prefix lookups
+            cls._instance.indexed_keys = {}  # id -> (name key, email key) currently in the indexes
+            cls._instance.lock = threading.Lock()  # Guards storage and the indexes across threadpool workers
             logger.info("Initialized MemoryTouristRepository with empty storage.")
         return cls._instance
 
+    def _index(self, tourist: Tourist) -> None:
+        """
+        Insert the tourist into the prefix indexes, replacing any stale entries.
+        Callers must hold self.lock.
+        :param tourist: The tourist object to index.
+        """
+        self._unindex(tourist.id)
+        keys = (tourist.name.lower(), tourist.email.lower())
+        insort(self.name_index, (keys[0], tourist.id))
+        insort(self.email_index, (keys[1], tourist.id))
+        self.indexed_keys[tourist.id] = keys
+
+    def _unindex(self, tourist_id: str) -> None:
+        """
+        Remove a tourist's entries from the prefix indexes, if present.
+        Callers must hold self.lock.
+        :param tourist_id: The ID of the tourist to remove.
+        """
+        keys = self.indexed_keys.pop(tourist_id, None)
+        if keys is None:
+            return
+        for index, key in zip((self.name_index, self.email_index), keys):
+            position = bisect_left(index, (key, tourist_id))
+            if position < len(index) and index[position] == (key, tourist_id):
+                del index[position]
+
+    @staticmethod
+    def _scan_prefix(index: list, prefix: str):
+        """
+        Yield the IDs of all index entries whose key starts with the prefix, in key order.
+        :param index: A sorted list of (key, id) pairs.
+        :param prefix: The lowercase prefix to match.
+        """
+        position = bisect_left(index, (prefix, ""))
+        while position < len(index) and index[position][0].startswith(prefix):
+            yield index[position][1]
+            position += 1
+
     def save(self, tourist: Tourist) -> Tourist:
         """
         Save or update a tourist in the in-memory store.
         :param tourist: The tourist object to save.
         :return: The saved tourist with a valid ID.
         """
-        if not tourist.id:
-            tourist.id = str(len(self.storage) + 1)  # Simple unique ID generation
-            logger.debug(f"Assigned new ID to tourist: {tourist.id}")
-        else:
-            logger.debug(f"Updating tourist with ID: {tourist.id}")
-        
-        self.storage[tourist.id] = tourist
+        with self.lock:
+            if not tourist.id:
+                tourist.id = str(len(self.storage) + 1)  # Simple unique ID generation
+                logger.debug(f"Assigned new ID to tourist: {tourist.id}")
+            else:
+                logger.debug(f"Updating tourist with ID: {tourist.id}")
+
+            self.storage[tourist.id] = tourist
+            self._index(tourist)
         logger.info(f"Saved tourist with ID: {tourist.id}")
         return tourist
 
@@ -54,8 +100,11 @@ class MemoryTouristRepository(TouristRepositoryInterface):
         :param tourist_id: The ID of the tourist to delete.
         :return: True if the tourist was deleted, False otherwise.
         """
-        if tourist_id in self.storage:
-            del self.storage[tourist_id]
+        with self.lock:
+            deleted = self.storage.pop(tourist_id, None) is not None
+            if deleted:
+                self._unindex(tourist_id)
+        if deleted:
             logger.info(f"Deleted tourist with ID: {tourist_id}")
             return True
         logger.warning(f"Failed to delete tourist with ID: {tourist_id} - not found.")
@@ -68,3 +117,23 @@ class MemoryTouristRepository(TouristRepositoryInterface):
         """
         logger.info(f"Listing all tourists. Total count: {len(self.storage)}")
         return list(self.storage.values())
+
+    def search_by_prefix(self, prefix: str, limit: int) -> List[Tourist]:
+        """
+        Find tourists whose name or email starts with the prefix using the sorted indexes.
+        :param prefix: The prefix to match (case-insensitive).
+        :param limit: The maximum number of tourists to return.
+        :return: A list of matching tourists, name matches first.
+        """
+        prefix = prefix.lower()
+        matches = {}
+        with self.lock:
+            for index in (self.name_index, self.email_index):
+                for tourist_id in self._scan_prefix(index, prefix):
+                    if len(matches) >= limit:
+                        break
+                    tourist = self.storage.get(tourist_id)
+                    if tourist:
+                        matches.setdefault(tourist_id, tourist)
+        logger.info(f"Prefix lookup for '{prefix}' returned {len(matches)} tourists.")
+        return list(matches.values())
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import MongoClient
+from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+from domain.repositories.idempotency_repository import IdempotencyRepositoryInterface
+from domain.models.idempotency_record import IdempotencyRecord
+from domain.models.tourist import Tourist
+from infrastructure.config.config import AppConfig
+from typing import Optional
+import logging
+from pydantic import ValidationError
+
+logger = logging.getLogger("tourist-service")
+
+INDEX_OPTIONS_CONFLICT = 85  # Mongo error code raised when an index exists with different options
+
+
+class MongoDBIdempotencyRepository(IdempotencyRepositoryInterface):
+    _instance = None  # Singleton instance
+
+    def __new__(cls, config: AppConfig, database: Optional[Database] = None):
+        """
+        Create the store, reusing an existing database handle (and its client) when given one.
+        """
+        if cls._instance is None:
+            try:
+                cls._instance = super().__new__(cls)
+                cls._instance.ttl_seconds = config.idempotency_ttl_seconds
+                cls._instance.client = None if database is not None else MongoClient(config.mongo_uri)
+                cls._instance.db = database if database is not None else cls._instance.client[config.mongo_database]
+                cls._instance.collection = cls._instance.db["idempotency_keys"]
+                cls._instance._ensure_ttl_index()
+                logger.info(f"Connected to MongoDB idempotency store: {config.mongo_database}")
+            except PyMongoError as e:
+                logger.error(f"Failed to initialize MongoDB idempotency store: {e}")
+                raise ConnectionError(f"Unable to initialize MongoDB idempotency store: {e}")
+        return cls._instance
+
+    def _ensure_ttl_index(self):
+        """
+        Create the TTL index Mongo uses to remove expired records in the background,
+        updating its expiry in place if IDEMPOTENCY_TTL_SECONDS has changed.
+        """
+        try:
+            self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds, name="created_at_ttl")
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            self.db.command(
+                "collMod",
+                self.collection.name,
+                index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": self.ttl_seconds},
+            )
+            logger.info(f"Updated idempotency TTL index to {self.ttl_seconds}s.")
+
+    def close_connection(self):
+        """Close the MongoDB connection, if this store owns it."""
+        if self.client:
+            self.client.close()
+            logger.info("MongoDB idempotency store connection closed.")
+
+    def _cutoff(self) -> datetime:
+        """Records created before this time have expired, even if the TTL monitor has not removed them yet."""
+        return datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+
+    def _from_mongo_document(self, document: dict) -> Optional[IdempotencyRecord]:
+        """Convert MongoDB document to IdempotencyRecord domain model."""
+        try:
+            return IdempotencyRecord(**document)
+        except ValidationError as e:
+            logger.error(f"Validation error converting document: {document}, error: {e}")
+            return None
+
+    def claim(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[IdempotencyRecord]:
+        """Atomically claim an idempotency key; the unique _id makes concurrent claims lose with DuplicateKeyError."""
+        now = datetime.now(timezone.utc)
+        document = {
+            "_id": key,
+            "key": key,
+            "fingerprint": fingerprint,
+            "tourist": None,
+            "created_at": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        }
+        # Records that have expired but not been removed by the TTL monitor yet, and pending
+        # claims whose owner let the lease run out (e.g. it crashed), can be taken over
+        takeover = {"_id": key, "$or": [
+            {"created_at": {"$lte": self._cutoff()}},
+            {"tourist": None, "lease_expires_at": {"$lte": now}},
+        ]}
+        try:
+            while True:
+                try:
+                    self.collection.insert_one(document)
+                    logger.info(f"Claimed idempotency key: {key}")
+                    return None
+                except DuplicateKeyError:
+                    pass
+                if self.collection.find_one_and_replace(takeover, document):
+                    logger.warning(f"Took over expired claim on idempotency key: {key}")
+                    return None
+                existing = self.collection.find_one({"_id": key})
+                if existing:
+                    break
+                # The record was removed between the insert and the lookup; try to claim it again
+        except PyMongoError as e:
+            logger.error(f"Error claiming idempotency key {key}: {e}")
+            raise RuntimeError(f"Failed to claim idempotency key {key}")
+        record = self._from_mongo_document(existing)
+        if record is None:
+            # None would tell the caller it owns the key, so never return it for a record we cannot read
+            raise RuntimeError(f"Unreadable record for idempotency key {key}")
+        return record
+
+    def complete(self, key: str, tourist: Tourist) -> None:
+        """Store the outcome of a claimed request; the TTL restarts from completion."""
+        try:
+            self.collection.update_one(
+                {"_id": key},
+                {
+                    "$set": {"tourist": tourist.model_dump(), "created_at": datetime.now(timezone.utc)},
+                    "$unset": {"lease_expires_at": ""},
+                },
+            )
+            logger.info(f"Completed idempotency key: {key}")
+        except PyMongoError as e:
+            logger.error(f"Error completing idempotency key {key}: {e}")
+            raise RuntimeError(f"Failed to complete idempotency key {key}")
+
+    def release(self, key: str) -> None:
+        """Drop a pending claim so a retry can run the request again."""
+        try:
+            self.collection.delete_one({"_id": key, "tourist": None})
+            logger.info(f"Released idempotency key: {key}")
+        except PyMongoError as e:
+            logger.error(f"Error releasing idempotency key {key}: {e}")
+            raise RuntimeError(f"Failed to release idempotency key {key}")
+
+    def find(self, key: str) -> Optional[IdempotencyRecord]:
+        """Find an unexpired record, pending or complete, by its idempotency key."""
+        try:
+            document = self.collection.find_one({"_id": key, "created_at": {"$gt": self._cutoff()}})
+        except PyMongoError as e:
+            logger.error(f"Error retrieving idempotency key {key}: {e}")
+            raise RuntimeError(f"Failed to retrieve idempotency key {key}")
+        return self._from_mongo_document(document) if document else None
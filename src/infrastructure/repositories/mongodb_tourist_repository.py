@@ -1,5 +1,6 @@
+import re
 from bson import ObjectId
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, UpdateOne
 from pymongo.errors import PyMongoError
 from domain.repositories.tourist_repository import TouristRepositoryInterface
 from domain.models.tourist import Tourist
@@ -21,12 +22,53 @@ class MongoDBTouristRepository(TouristRepositoryInterface):
                 cls._instance.client = MongoClient(config.mongo_uri)
                 cls._instance.db = cls._instance.client[config.mongo_database]
                 cls._instance.collection = cls._instance.db["tourists"]
+                cls._instance._ensure_prefix_indexes()
                 logger.info(f"Connected to MongoDB database: {config.mongo_database}")
             except PyMongoError as e:
                 logger.error(f"Failed to connect to MongoDB: {e}")
                 raise ConnectionError(f"Unable to connect to MongoDB at {config.mongo_uri}")
         return cls._instance
 
+    @staticmethod
+    def _prefix_key(value: str) -> str:
+        """Normalize a name or email for the lowercase shadow fields and prefix lookups."""
+        return value.lower()
+
+    def _ensure_prefix_indexes(self):
+        """
+        Index the lowercase shadow fields for anchored prefix lookups.
+        Anchored regexes on a case-sensitive field can use a plain B-tree range scan,
+        which a case-insensitive regex or collation index cannot.
+        """
+        self.collection.create_index([("name_lower", ASCENDING)], name="name_lower_prefix")
+        self.collection.create_index([("email_lower", ASCENDING)], name="email_lower_prefix")
+
+    def backfill_prefix_fields(self, batch_size: int = 1000) -> int:
+        """
+        Populate the lowercase shadow fields on documents saved before they existed.
+        Uses the same Python normalization as new saves, since Mongo's $toLower only handles ASCII.
+        Run once at startup, before the application serves traffic.
+        """
+        query = {"$or": [{"name_lower": {"$exists": False}}, {"email_lower": {"$exists": False}}]}
+        try:
+            updated = 0
+            batch = []
+            for doc in self.collection.find(query, {"name": 1, "email": 1}):
+                batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+                    "name_lower": self._prefix_key(doc.get("name", "")),
+                    "email_lower": self._prefix_key(doc.get("email", "")),
+                }}))
+                if len(batch) >= batch_size:
+                    updated += self.collection.bulk_write(batch, ordered=False).modified_count
+                    batch = []
+            if batch:
+                updated += self.collection.bulk_write(batch, ordered=False).modified_count
+            logger.info(f"Backfilled prefix lookup fields on {updated} tourists.")
+            return updated
+        except PyMongoError as e:
+            logger.error(f"Error backfilling prefix lookup fields: {e}")
+            raise RuntimeError("Failed to backfill prefix lookup fields")
+
     def close_connection(self):
         """Close the MongoDB connection."""
         if self.client:
@@ -38,6 +80,8 @@ class MongoDBTouristRepository(TouristRepositoryInterface):
         document = tourist.model_dump()
         document['_id'] = ObjectId(tourist.id) if ObjectId.is_valid(tourist.id) else ObjectId()
         document['id'] = str(document['_id'])  # Store string ID for consistency
+        document['name_lower'] = self._prefix_key(tourist.name)  # Shadow fields for prefix lookups
+        document['email_lower'] = self._prefix_key(tourist.email)
         return document
 
     def _from_mongo_document(self, document: dict) -> Optional[Tourist]:
@@ -108,3 +152,27 @@ class MongoDBTouristRepository(TouristRepositoryInterface):
         except PyMongoError as e:
             logger.error(f"Error listing all tourists: {e}")
             raise RuntimeError("Failed to list all tourists")
+
+    def search_by_prefix(self, prefix: str, limit: int) -> List[Tourist]:
+        """Find tourists whose name or email starts with the prefix, via the shadow field indexes."""
+        pattern = {"$regex": f"^{re.escape(self._prefix_key(prefix))}"}
+        try:
+            matches = {}
+            for field in ("name_lower", "email_lower"):
+                remaining = limit - len(matches)
+                if remaining <= 0:
+                    break
+                cursor = (
+                    self.collection.find({field: pattern, "_id": {"$nin": list(matches)}})
+                    .sort(field, ASCENDING)
+                    .limit(remaining)
+                )
+                for doc in cursor:
+                    tourist = self._from_mongo_document(doc)
+                    if tourist:
+                        matches[doc["_id"]] = tourist
+            logger.info(f"Prefix lookup for '{prefix}' returned {len(matches)} tourists.")
+            return list(matches.values())
+        except PyMongoError as e:
+            logger.error(f"Error looking up tourists by prefix '{prefix}': {e}")
+            raise RuntimeError(f"Failed to look up tourists by prefix '{prefix}'")
@@ -1,5 +1,5 @@
 import logging
-from infrastructure.config.container import shutdown_repository
+from infrastructure.config.container import migrate_repository, shutdown_repository
 from infrastructure.config.settings import get_logging_config
 
 # Apply logging configuration once, ideally during application setup
@@ -8,7 +8,8 @@ logger = logging.getLogger("tourist-service")
 
 async def startup():
     logger.info("Starting up the application")
-    # Add startup logic here if necessary
+    migrate_repository()
+    logger.info("Repository migrations complete")
 
 async def shutdown():
     logger.info("Shutting down the application")
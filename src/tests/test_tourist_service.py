@@ -1,8 +1,13 @@
+import asyncio
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from domain.models.tourist import Tourist
 from domain.models.preference import Preference
 from infrastructure.repositories.mongodb_tourist_repository import MongoDBTouristRepository
 from infrastructure.repositories.in_memory_tourist_repository import MemoryTouristRepository
+from infrastructure.repositories.in_memory_idempotency_repository import MemoryIdempotencyRepository
+from application.services.tourist_service import TouristService, IdempotencyKeyInProgressError
 from infrastructure.config.config import AppConfig
 from bson import ObjectId
 from unittest.mock import patch
@@ -161,3 +166,217 @@ def test_repo_singleton(test_config):
         repo1 = MemoryTouristRepository()
         repo2 = MemoryTouristRepository()
         assert repo1 is repo2  # Ensures singleton behavior
+
+def test_search_by_prefix(test_repository):
+    repo = test_repository
+
+    # Create and save tourists with distinct name and email prefixes
+    repo.save(Tourist(name="Zelda Prefix", email="zelda@example.com"))
+    repo.save(Tourist(name="Zeno Prefix", email="zeno@example.com"))
+    repo.save(Tourist(name="Yusuf", email="zebra.fan@example.com"))
+
+    # Matching is case-insensitive and covers both name and email
+    names = {tourist.name for tourist in repo.search_by_prefix("ZE", limit=10)}
+    assert {"Zelda Prefix", "Zeno Prefix", "Yusuf"} <= names
+
+    # Results are capped at the limit
+    assert len(repo.search_by_prefix("ze", limit=2)) == 2
+
+def test_search_by_prefix_tracks_updates_and_deletes():
+    repo = MemoryTouristRepository()
+
+    # Save a tourist, then rename them
+    tourist = repo.save(Tourist(name="Quentin", email="quentin@example.com"))
+    tourist.name = "Xavier"
+    repo.save(tourist)
+
+    # The index follows the rename instead of keeping the stale name
+    assert [t.id for t in repo.search_by_prefix("xav", limit=10)] == [tourist.id]
+    assert [t.id for t in repo.search_by_prefix("quentin", limit=10)] == [tourist.id]  # Still matches by email
+    assert repo.search_by_prefix("quent@", limit=10) == []
+
+    # Deleted tourists drop out of the index
+    repo.delete(tourist.id)
+    assert repo.search_by_prefix("xav", limit=10) == []
+
+def test_search_by_prefix_during_concurrent_writes():
+    repo = MemoryTouristRepository()
+
+    def churn(worker):
+        for i in range(200):
+            tourist = repo.save(Tourist(name=f"Churn {worker}-{i}", email=f"churn{worker}-{i}@example.com"))
+            repo.delete(tourist.id)
+
+    def search():
+        for _ in range(200):
+            repo.search_by_prefix("churn", limit=50)
+
+    # Lookups racing with saves and deletes must not fail on stale index entries
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(churn, worker) for worker in range(4)]
+        futures += [pool.submit(search) for _ in range(4)]
+        for future in futures:
+            future.result()
+
+    assert repo.search_by_prefix("churn", limit=50) == []
+
+def test_backfill_prefix_fields(test_config):
+    repo = MongoDBTouristRepository(config=test_config)
+
+    # Simulate a document saved before the shadow fields existed
+    legacy_id = ObjectId()
+    repo.collection.insert_one({"_id": legacy_id, "id": str(legacy_id), "name": "Émile", "email": "EMILE@example.com"})
+    repo.backfill_prefix_fields()
+
+    # Non-ASCII names are normalized the same way as new saves
+    assert str(legacy_id) in [tourist.id for tourist in repo.search_by_prefix("émi", limit=10)]
+    assert str(legacy_id) in [tourist.id for tourist in repo.search_by_prefix("emile@", limit=10)]
+    repo.collection.delete_one({"_id": legacy_id})
+
+def test_idempotent_create_under_retry_storm():
+    repo = MemoryTouristRepository()
+    service = TouristService(
+        repository=repo,
+        idempotency_repository=MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100),
+    )
+
+    # Slow down writes so the retries overlap with the first in-flight create
+    original_save = repo.save
+    def slow_save(tourist):
+        time.sleep(0.05)
+        return original_save(tourist)
+
+    with patch.object(repo, "save", side_effect=slow_save) as mock_save:
+        # Simulate a retry storm: many concurrent and late retries with the same key
+        async def storm():
+            return await asyncio.gather(*[
+                service.create_tourist("Storm", "storm@example.com", "retry-key") for _ in range(50)
+            ])
+        tourists = asyncio.run(storm())
+        tourists.append(asyncio.run(service.create_tourist("Storm", "storm@example.com", "retry-key")))
+
+        # Backend writes stay flat: exactly one save, one tourist returned to every caller
+        assert mock_save.call_count == 1
+        assert len({tourist.id for tourist in tourists}) == 1
+
+        # Requests without a key are not deduplicated
+        asyncio.run(service.create_tourist("Storm", "storm@example.com"))
+        assert mock_save.call_count == 2
+
+def test_idempotency_key_reused_for_different_request():
+    service = TouristService(
+        repository=MemoryTouristRepository(),
+        idempotency_repository=MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100),
+    )
+    asyncio.run(service.create_tourist("Alice", "alice@example.com", "reused-key"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.create_tourist("Bob", "bob@example.com", "reused-key"))
+
+def test_idempotency_store_evicts_oldest_completed():
+    store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=2)
+    tourist = Tourist(name="Alice", email="alice@example.com")
+    for key in ("first", "second", "third"):
+        store.claim(key, "f", lease_seconds=30)
+        store.complete(key, tourist)
+
+    # The store is bounded, so the oldest key was evicted
+    assert store.find("first") is None
+    assert store.find("third").tourist.id == tourist.id
+
+def test_idempotency_store_keeps_pending_claims_when_full():
+    store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=1)
+    tourist = Tourist(name="Alice", email="alice@example.com")
+
+    # A second key cannot push out the first key's in-flight claim
+    assert store.claim("first", "f", lease_seconds=30) is None
+    with pytest.raises(RuntimeError):
+        store.claim("second", "f", lease_seconds=30)
+
+    # The first owner can still complete, so its retries replay instead of creating a duplicate
+    store.complete("first", tourist)
+    assert store.claim("first", "f", lease_seconds=30).tourist.id == tourist.id
+
+    # Once completed, the first record makes room for the second claim
+    assert store.claim("second", "f", lease_seconds=30) is None
+    assert store.find("first") is None
+
+def test_idempotency_store_expires_records():
+    store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100)
+    store.claim("expiring", "f", lease_seconds=30)
+
+    # Expired records are not returned and the key can be claimed again
+    with patch("infrastructure.repositories.in_memory_idempotency_repository.time.monotonic", return_value=time.monotonic() + 61):
+        assert store.find("expiring") is None
+        assert store.claim("expiring", "f", lease_seconds=30) is None
+
+def test_idempotent_create_takes_over_abandoned_claim():
+    repo = MemoryTouristRepository()
+    store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100)
+    service = TouristService(
+        repository=repo, idempotency_repository=store, idempotency_wait_seconds=2, idempotency_lease_seconds=0.3
+    )
+
+    # Simulate an owner that claimed the key and then died without completing or releasing it
+    store.claim("abandoned-key", service._fingerprint("Erin", "erin@example.com"), lease_seconds=0.3)
+
+    # A retry waits out the lease, takes the claim over and creates the tourist
+    tourist = asyncio.run(service.create_tourist("Erin", "erin@example.com", "abandoned-key"))
+    assert repo.find_by_id(tourist.id) is not None
+    assert store.find("abandoned-key").tourist.id == tourist.id
+
+def test_idempotent_create_across_instances():
+    repo = MemoryTouristRepository()
+    shared_store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100)
+
+    # Separate services stand in for replicas that only share the idempotency store
+    replicas = [TouristService(repository=repo, idempotency_repository=shared_store) for _ in range(5)]
+
+    original_save = repo.save
+    def slow_save(tourist):
+        time.sleep(0.2)
+        return original_save(tourist)
+
+    with patch.object(repo, "save", side_effect=slow_save) as mock_save:
+        async def storm():
+            return await asyncio.gather(*[
+                replicas[i % len(replicas)].create_tourist("Replica", "replica@example.com", "replica-key")
+                for i in range(20)
+            ])
+        tourists = asyncio.run(storm())
+
+        assert mock_save.call_count == 1
+        assert len({tourist.id for tourist in tourists}) == 1
+
+def test_idempotent_create_when_record_fails_to_complete():
+    repo = MemoryTouristRepository()
+    store = MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100)
+    service = TouristService(
+        repository=repo, idempotency_repository=store, idempotency_wait_seconds=0.2, idempotency_lease_seconds=30
+    )
+
+    with patch.object(repo, "save", wraps=repo.save) as mock_save:
+        with patch.object(store, "complete", side_effect=RuntimeError("store unavailable")):
+            # The tourist was created, so the caller still gets it back
+            tourist = asyncio.run(service.create_tourist("Carol", "carol@example.com", "incomplete-key"))
+        assert repo.find_by_id(tourist.id) is not None
+
+        # A retry within the lease reports a conflict instead of creating a duplicate
+        with pytest.raises(IdempotencyKeyInProgressError):
+            asyncio.run(service.create_tourist("Carol", "carol@example.com", "incomplete-key"))
+        assert mock_save.call_count == 1
+
+def test_idempotent_create_retries_after_failed_save():
+    repo = MemoryTouristRepository()
+    service = TouristService(
+        repository=repo,
+        idempotency_repository=MemoryIdempotencyRepository(ttl_seconds=60, max_entries=100),
+    )
+
+    with patch.object(repo, "save", side_effect=RuntimeError("database unavailable")):
+        with pytest.raises(RuntimeError):
+            asyncio.run(service.create_tourist("Dave", "dave@example.com", "failed-key"))
+
+    # The claim was released, so the retry creates the tourist
+    tourist = asyncio.run(service.create_tourist("Dave", "dave@example.com", "failed-key"))
+    assert repo.find_by_id(tourist.id) is not None